@@ -0,0 +1,102 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, QueryDict
+from django.utils.cache import patch_vary_headers
+
+from core.compression import MIN_COMPRESS_LENGTH, compress, negotiate_encoding
+from data.services import get_data_version
+
+
+def normalised_filters(request, filter_names, single_value_names=()):
+    """
+    The filter set of a request with value order and duplicates removed. Single-valued filters are
+    read with GET.get(), which keeps the last value, just as the payload builders read them.
+    """
+    filters = [
+        (name, tuple(sorted(set(request.GET.getlist(name)))))
+        for name in filter_names
+        if request.GET.getlist(name)
+    ]
+    filters += [(name, (request.GET.get(name),)) for name in single_value_names if name in request.GET]
+    return tuple(filters)
+
+
+def filter_params(filters):
+    """The QueryDict a payload is built from, so the payload always matches its cache key."""
+    params = QueryDict(mutable=True)
+    for name, values in filters:
+        params.setlist(name, list(values))
+    return params
+
+
+def cache_key(name, filters):
+    digest = hashlib.md5(repr(filters).encode()).hexdigest()
+    return f'api:{name}:{get_data_version()}:{digest}'
+
+
+def single_flight(key, compute):
+    """
+    Return the cached value for key, computing it at most once at a time across all workers.
+
+    The first caller takes a cache lock and computes; concurrent callers poll the cache for its
+    result. A caller that waits longer than API_COALESCE_TIMEOUT computes the value itself, and the
+    lock expires after the same timeout in case its holder died.
+    """
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + settings.API_COALESCE_TIMEOUT
+
+    while True:
+        if cache.add(lock_key, True, settings.API_COALESCE_TIMEOUT):
+            try:
+                # The previous lock holder may have finished between our cache miss and the lock
+                value = cache.get(key)
+                if value is None:
+                    value = compute()
+                    cache.set(key, value, settings.API_CACHE_TIMEOUT)
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        time.sleep(settings.API_COALESCE_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() >= deadline:
+            return compute()
+
+
+def cached_json_response(request, name, filter_names, build_payload, single_value_names=()):
+    """
+    Serve a JSON payload from the cache, keyed on the normalised filters and the data version.
+
+    build_payload is called with the normalised filters as a QueryDict rather than request.GET.
+    Concurrent misses for the same key are coalesced so the payload is built once. The encoded
+    variants (gzip, br) are cached next to the plain JSON so a popular payload is only compressed
+    once per data version.
+    """
+    filters = normalised_filters(request, filter_names, single_value_names)
+    key = cache_key(name, filters)
+    content = cache.get(key)
+    if content is None:
+        content = single_flight(
+            key, lambda: json.dumps(build_payload(filter_params(filters)), cls=DjangoJSONEncoder).encode()
+        )
+
+    encoding = negotiate_encoding(request) if len(content) >= MIN_COMPRESS_LENGTH else None
+    if encoding is None:
+        response = HttpResponse(content, content_type='application/json')
+    else:
+        encoded_key = f'{key}:{encoding}'
+        encoded = cache.get(encoded_key)
+        if encoded is None:
+            encoded = single_flight(encoded_key, lambda: compress(content, encoding))
+        response = HttpResponse(encoded, content_type='application/json')
+        response['Content-Encoding'] = encoding
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import QueryDict
+from django.utils import timezone
+
+from core.db_routers import replica_reads
+from api.payloads import filter_options_payload, visa_data_payload, occupation_trends_payload
+from data.models import VisaType, Occupation
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = 'Write versioned JSON snapshots of the dashboard data for static or CDN serving'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None, help='Directory to write snapshots to (defaults to SNAPSHOT_ROOT)'
+        )
+        parser.add_argument(
+            '--keep', type=int, default=2, help='Number of snapshot versions to keep, including the new one'
+        )
+
+    def handle(self, *args, **options):
+        with replica_reads():
+            self._export(options)
+
+    def _export(self, options):
+        root = Path(options['output'] or settings.SNAPSHOT_ROOT)
+        version, version_dir = self._create_version_dir(root)
+
+        manifest = {
+            'version': version,
+            'generated_at': timezone.now().isoformat(),
+            'filter_options': self._write(version_dir, 'filter-options.json', filter_options_payload()),
+            'occupation_trends': self._write(
+                version_dir, 'occupation-trends.json', occupation_trends_payload(QueryDict())
+            ),
+            'visa_types': {},
+            'occupations': {},
+        }
+
+        for visa_type in VisaType.objects.order_by('name'):
+            params = QueryDict(mutable=True)
+            params['visa_type'] = visa_type.name
+            manifest['visa_types'][visa_type.name] = self._write(
+                version_dir, f'visa-types/{visa_type.pk}.json', visa_data_payload(params)
+            )
+
+        for occupation in Occupation.objects.order_by('name'):
+            params = QueryDict(mutable=True)
+            params['occupation'] = occupation.name
+            manifest['occupations'][occupation.name] = self._write(
+                version_dir, f'occupations/{occupation.pk}.json', visa_data_payload(params)
+            )
+
+        # Publish the manifest last so readers never see a half-written version
+        temporary_manifest = root / f'.{MANIFEST_NAME}.{version}.tmp'
+        temporary_manifest.write_text(json.dumps(manifest, cls=DjangoJSONEncoder))
+        os.replace(temporary_manifest, root / MANIFEST_NAME)
+
+        self._prune(root, options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported snapshot {version}: {len(manifest["visa_types"])} visa types, '
+            f'{len(manifest["occupations"])} occupations.'
+        ))
+
+    def _create_version_dir(self, root):
+        """
+        A new, empty directory named after the current time down to the microsecond. Exports that
+        still collide (e.g. back-to-back imports) take the next free number, so a version directory
+        is never rewritten under a published manifest.
+        """
+        root.mkdir(parents=True, exist_ok=True)
+        version = int(timezone.now().strftime('%Y%m%d%H%M%S%f'))
+        while True:
+            version_dir = root / str(version)
+            try:
+                version_dir.mkdir()
+            except FileExistsError:
+                version += 1
+                continue
+            return str(version), version_dir
+
+    def _write(self, version_dir, relative_path, payload):
+        path = version_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, cls=DjangoJSONEncoder))
+        return f'{version_dir.name}/{relative_path}'
+
+    def _prune(self, root, keep):
+        versions = sorted(path for path in root.iterdir() if path.is_dir() and path.name.isdigit())
+        for path in versions[:-max(keep, 1)]:
+            shutil.rmtree(path)
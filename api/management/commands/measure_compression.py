@@ -0,0 +1,43 @@
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from core.compression import available_encodings
+
+ENDPOINTS = (
+    '/api/data/filter-options/',
+    '/api/data/visa-data/',
+    '/api/data/visa-data/?eoi_status=INVITED',
+    '/api/data/occupation-trends/',
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure response size and latency of the API endpoints for each content encoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Number of timed cached requests')
+
+    def handle(self, *args, **options):
+        client = Client()
+        for url in ENDPOINTS:
+            self.stdout.write(url)
+            plain_size = None
+            for encoding in ('identity',) + available_encodings():
+                cache.clear()
+                started = time.perf_counter()
+                response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                cold = time.perf_counter() - started
+
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                    timings.append(time.perf_counter() - started)
+
+                size = len(response.content)
+                plain_size = plain_size or size
+                self.stdout.write(
+                    f'  {encoding:<8} {size:>10} bytes ({size / plain_size:6.1%})  '
+                    f'cold {cold * 1000:7.1f} ms  cached {min(timings) * 1000:6.1f} ms'
+                )
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Boots a web worker the way gunicorn does (settings, apps, admin autodiscovery, URLconf)
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy_modules': [name for name in ('pandas', 'numpy', 'openpyxl') if name in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Measure web worker boot time, resident memory and the slowest imports in a fresh interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Number of slowest top-level imports to list')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'))
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+
+        # -X importtime lines: "import time: self [us] | cumulative | imported package"
+        top_level = []
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, package = line[len('import time:'):].split('|')
+            if not package.startswith('  '):
+                top_level.append((int(cumulative), package.strip()))
+
+        self.stdout.write(f'Boot time: {result["seconds"] * 1000:.0f} ms')
+        self.stdout.write(f'Max RSS after django.setup(): {result["max_rss_kb"] / 1024:.1f} MiB')
+        self.stdout.write(f'Heavy modules loaded: {", ".join(result["heavy_modules"]) or "none"}')
+        self.stdout.write('Slowest top-level imports:')
+        for cumulative, package in sorted(top_level, reverse=True)[:options['top']]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f} ms  {package}')
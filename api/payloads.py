@@ -0,0 +1,120 @@
+from data.models import VisaData, VisaType, Occupation, MonthYear, OccupationTrend
+from data.search import search_names
+from data.services import get_points_facet
+
+
+def visa_data_payload(params):
+    queryset = VisaData.objects.select_related('month_year', 'visa_type', 'occupation').all()
+
+    # Handle multiple visa types
+    visa_types = params.getlist('visa_type')
+    if visa_types:
+        queryset = queryset.filter(visa_type__name__in=visa_types)
+
+    # Handle multiple occupations
+    occupations = params.getlist('occupation')
+    if occupations:
+        queryset = queryset.filter(occupation__name__in=occupations)
+
+    # Handle multiple EOI statuses
+    eoi_statuses = params.getlist('eoi_status')
+    if eoi_statuses:
+        status_codes = [VisaData.Status[status] for status in eoi_statuses if status in VisaData.Status.names]
+        queryset = queryset.filter(status__in=status_codes)
+
+    # Handle multiple points
+    points_list = params.getlist('points')
+    if points_list:
+        try:
+            points_values = [int(p) for p in points_list]
+            queryset = queryset.filter(points__in=points_values)
+        except ValueError:
+            pass
+
+    # Handle month year (single value); filtering on the ids lets Postgres prune month partitions
+    month_year = params.get('month_year')
+    if month_year:
+        month_year_ids = list(MonthYear.objects.filter(name__icontains=month_year).values_list('id', flat=True))
+        queryset = queryset.filter(month_year_id__in=month_year_ids)
+
+    data = []
+    for record in queryset:
+        data.append({
+            'id': record.id,
+            'month_year': record.month_year.name,
+            'visa_type': record.visa_type.name,
+            'occupation': record.occupation.name,
+            'eoi_status': record.get_status_display(),
+            'points': record.points,
+            'count_eois': record.count
+        })
+
+    return {
+        'count': len(data),
+        'results': data
+    }
+
+
+def filter_options_payload():
+    visa_types = list(VisaType.objects.values_list('name', flat=True).distinct())
+    occupations = list(Occupation.objects.values_list('name', flat=True).distinct())
+    month_years = list(MonthYear.objects.values_list('name', flat=True).distinct())
+    eoi_statuses = list(VisaData.Status.labels)
+
+    unique_points = get_points_facet()
+
+    return {
+        'visa_types': visa_types,
+        'occupations': occupations,
+        'month_years': month_years,
+        'eoi_statuses': eoi_statuses,
+        'points': unique_points
+    }
+
+
+def occupation_trends_payload(params):
+    queryset = OccupationTrend.objects.select_related('month_year', 'visa_type', 'occupation').order_by(
+        'visa_type__name', 'occupation__name', 'month_year__date', 'month_year__name'
+    )
+
+    # Handle multiple visa types
+    visa_types = params.getlist('visa_type')
+    if visa_types:
+        queryset = queryset.filter(visa_type__name__in=visa_types)
+
+    # Handle multiple occupations
+    occupations = params.getlist('occupation')
+    if occupations:
+        queryset = queryset.filter(occupation__name__in=occupations)
+
+    data = []
+    for trend in queryset:
+        data.append({
+            'month_year': trend.month_year.name,
+            'visa_type': trend.visa_type.name,
+            'occupation': trend.occupation.name,
+            'min_invited_points': trend.min_invited_points,
+            'min_invited_points_change': trend.min_invited_points_change,
+            'invited_count': trend.invited_count,
+            'invited_count_change': trend.invited_count_change
+        })
+
+    return {
+        'count': len(data),
+        'results': data
+    }
+
+
+def search_payload(params):
+    query = params.get('q', '')
+    kind = params.get('kind', 'occupation')
+    try:
+        limit = max(1, min(int(params.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+
+    return {
+        'query': query,
+        'kind': kind,
+        'results': search_names(kind, query, limit)
+    }
@@ -1,3 +1,300 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, RequestFactory
+
+from api.views import get_visa_data
+from core import compression
+from core.compression import CompressionMiddleware, negotiate_encoding
+from core.db_routers import REPLICA_DATABASE, pin_reads_to_primary, replica_reads
+from data.models import MonthYear, Occupation, VisaData, VisaType
+
+
+class NegotiateEncodingTests(SimpleTestCase):
+    def negotiate(self, accept_encoding):
+        return negotiate_encoding(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    def test_highest_q_value_wins(self):
+        self.assertEqual(self.negotiate('gzip;q=1.0, br;q=0.1'), 'gzip')
+
+    @skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli_breaks_ties(self):
+        self.assertEqual(self.negotiate('gzip, br'), 'br')
+        self.assertEqual(self.negotiate('br;q=0.5, gzip;q=0.5'), 'br')
+        self.assertEqual(self.negotiate('gzip;q=0, *'), 'br')
+
+    def test_refused_or_unknown_codings_give_none(self):
+        self.assertIsNone(self.negotiate(''))
+        self.assertIsNone(self.negotiate('identity'))
+        self.assertIsNone(self.negotiate('gzip;q=0, br;q=0'))
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = json.dumps({'results': [{'occupation': 'Software Engineer', 'points': 85}] * 20}).encode()
+
+    def respond(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_json_is_compressed(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_tiny_json_is_left_alone_but_varies(self):
+        response = self.respond(HttpResponse(b'{}', content_type='application/json'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, b'{}')
+
+    def test_encoded_responses_are_left_alone(self):
+        encoded = HttpResponse(b'already encoded' * 50, content_type='application/json')
+        encoded['Content-Encoding'] = 'br'
+        response = self.respond(encoded)
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response.content, b'already encoded' * 50)
+
+    def test_html_is_not_compressed(self):
+        response = self.respond(HttpResponse(b'<p>csrf</p>' * 50, content_type='text/html'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # The router only needs the alias to exist; nothing here opens a connection to it
+        patcher = mock.patch.dict(settings.DATABASES, {REPLICA_DATABASE: settings.DATABASES['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opted_in_reads_go_to_the_replica(self):
+        with replica_reads():
+            self.assertEqual(VisaData.objects.all().db, REPLICA_DATABASE)
+        self.assertEqual(VisaData.objects.all().db, 'default')
+
+    def test_writes_go_to_the_primary(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_write(VisaData), 'default')
+
+    def test_pinned_reads_go_to_the_primary(self):
+        pin_reads_to_primary()
+        with replica_reads():
+            self.assertEqual(VisaData.objects.all().db, 'default')
+
+    def test_reads_stay_on_the_primary_without_a_replica(self):
+        del settings.DATABASES[REPLICA_DATABASE]
+        with replica_reads():
+            self.assertEqual(VisaData.objects.all().db, 'default')
+
+
+class ConcurrentVisaDataRequestTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        pin_reads_to_primary()
+        month_year = MonthYear.objects.create(name='2025-01')
+        visa_types = [VisaType.objects.create(name=name) for name in ('189', '190')]
+        occupation = Occupation.objects.create(name='Software Engineer')
+        for visa_type in visa_types:
+            VisaData.objects.create(
+                month_year=month_year, visa_type=visa_type, occupation=occupation,
+                status=VisaData.Status.INVITED, points=85, count=12,
+            )
+        self.factory = RequestFactory()
+
+    def visa_data_queries(self, queries, delay=0.0):
+        """Execute wrapper recording queries against VisaData, slowed down so requests overlap."""
+        def wrapper(execute, sql, params, many, context):
+            if VisaData._meta.db_table in sql:
+                queries.append(sql)
+                time.sleep(delay)
+            return execute(sql, params, many, context)
+        return wrapper
+
+    def test_concurrent_identical_requests_query_the_database_once(self):
+        # The same filter set in a different order must share one computation
+        queries = [
+            {'occupation': 'Software Engineer', 'visa_type': ['189', '190']},
+            {'visa_type': ['190', '189'], 'occupation': 'Software Engineer'},
+        ]
+
+        single = []
+        with connection.execute_wrapper(self.visa_data_queries(single)):
+            get_visa_data(self.factory.get('/api/data/visa-data/', queries[0]))
+        self.assertTrue(single)
+        cache.clear()
+        pin_reads_to_primary()
+
+        concurrent = []
+        responses = []
+        start = threading.Barrier(10)
+
+        def request_payload(query):
+            try:
+                with connection.execute_wrapper(self.visa_data_queries(concurrent, delay=0.2)):
+                    start.wait()
+                    responses.append(get_visa_data(self.factory.get('/api/data/visa-data/', query)))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=request_payload, args=(queries[i % 2],)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(responses), 10)
+        self.assertEqual(len(concurrent), len(single))
+        self.assertEqual({response.content for response in responses}, {responses[0].content})
+        self.assertEqual(json.loads(responses[0].content)['count'], 2)
+
+
+class VisaDataViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Test rows are uncommitted, so a configured replica could not see them
+        pin_reads_to_primary()
+        VisaData.objects.create(
+            month_year=MonthYear.objects.create(name='2025-01'),
+            visa_type=VisaType.objects.create(name='189'),
+            occupation=Occupation.objects.create(name='Software Engineer'),
+            status=VisaData.Status.INVITED,
+            points=85,
+            count=12,
+        )
+
+    def test_repeated_query_is_served_from_cache(self):
+        first = self.client.get('/api/data/visa-data/', {'eoi_status': 'INVITED'})
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/data/visa-data/', {'eoi_status': 'INVITED'})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second.json()['results'][0]['eoi_status'], 'INVITED')
+
+    def test_encoded_payload_is_served_from_cache(self):
+        for points in range(60, 100, 5):
+            VisaData.objects.create(
+                month_year=MonthYear.objects.get(name='2025-01'),
+                visa_type=VisaType.objects.get(name='189'),
+                occupation=Occupation.objects.get(name='Software Engineer'),
+                status=VisaData.Status.INVITED,
+                points=points,
+                count=1,
+            )
+
+        first = self.client.get('/api/data/visa-data/', HTTP_ACCEPT_ENCODING='gzip')
+        with self.assertNumQueries(0), mock.patch('api.cache.compress') as compress:
+            second = self.client.get('/api/data/visa-data/', HTTP_ACCEPT_ENCODING='gzip')
+
+        compress.assert_not_called()
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', second['Vary'])
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(len(json.loads(gzip.decompress(second.content))['results']), 9)
+
+    def test_single_valued_filter_uses_the_last_value_for_key_and_payload(self):
+        VisaData.objects.create(
+            month_year=MonthYear.objects.create(name='2024-12'),
+            visa_type=VisaType.objects.get(name='189'),
+            occupation=Occupation.objects.get(name='Software Engineer'),
+            status=VisaData.Status.INVITED,
+            points=90,
+            count=3,
+        )
+
+        december = self.client.get('/api/data/visa-data/?month_year=2025-01&month_year=2024-12').json()
+        january = self.client.get('/api/data/visa-data/?month_year=2024-12&month_year=2025-01').json()
+
+        self.assertEqual([row['month_year'] for row in december['results']], ['2024-12'])
+        self.assertEqual([row['month_year'] for row in january['results']], ['2025-01'])
+
+
+class ExportSnapshotsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        pin_reads_to_primary()
+        VisaData.objects.create(
+            month_year=MonthYear.objects.create(name='2025-01'),
+            visa_type=VisaType.objects.create(name='189'),
+            occupation=Occupation.objects.create(name='Software Engineer'),
+            status=VisaData.Status.INVITED,
+            points=85,
+            count=12,
+        )
+
+    def export(self, keep=2):
+        call_command('export_snapshots', output=str(self.root), keep=keep, stdout=StringIO())
+        return json.loads((self.root / 'manifest.json').read_text())
+
+    def read(self, relative_path):
+        return json.loads((self.root / relative_path).read_text())
+
+    def versions(self):
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def test_manifest_points_at_the_exported_files(self):
+        manifest = self.export()
+
+        self.assertEqual(self.versions(), [manifest['version']])
+        self.assertEqual(self.read(manifest['filter_options'])['visa_types'], ['189'])
+        self.assertEqual(self.read(manifest['occupation_trends'])['count'], 0)
+        by_visa_type = self.read(manifest['visa_types']['189'])
+        self.assertEqual(by_visa_type['results'][0]['occupation'], 'Software Engineer')
+        by_occupation = self.read(manifest['occupations']['Software Engineer'])
+        self.assertEqual(by_occupation['results'][0]['points'], 85)
+        # Only the published manifest is left behind
+        self.assertEqual(sorted(path.name for path in self.root.iterdir() if path.is_file()), ['manifest.json'])
+
+    def test_manifest_is_published_after_every_file_is_written(self):
+        replace = os.replace
+
+        def check_files_then_replace(source, destination):
+            manifest = json.loads(Path(source).read_text())
+            paths = [manifest['filter_options'], manifest['occupation_trends']]
+            paths += [*manifest['visa_types'].values(), *manifest['occupations'].values()]
+            for path in paths:
+                self.assertTrue((self.root / path).is_file(), path)
+            replace(source, destination)
+
+        with mock.patch('api.management.commands.export_snapshots.os.replace', side_effect=check_files_then_replace):
+            self.export()
+
+    def test_exports_in_the_same_instant_get_their_own_version(self):
+        now = datetime.datetime(2025, 1, 31, 12, 0, tzinfo=datetime.timezone.utc)
+        with mock.patch('api.management.commands.export_snapshots.timezone.now', return_value=now):
+            first = self.export()
+            first_file = self.root / first['visa_types']['189']
+            written = first_file.stat().st_mtime_ns
+            second = self.export()
+
+        self.assertNotEqual(first['version'], second['version'])
+        self.assertEqual(first_file.stat().st_mtime_ns, written)
+        self.assertEqual(self.versions(), [first['version'], second['version']])
+
+    def test_prune_keeps_the_newest_versions(self):
+        versions = [self.export(keep=2)['version'] for _ in range(3)]
+        self.assertEqual(self.versions(), versions[1:])
+
+        latest = self.export(keep=1)
+        self.assertEqual(self.versions(), [latest['version']])
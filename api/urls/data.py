@@ -4,4 +4,6 @@ from .. import views
 urlpatterns = [
     path('visa-data/', views.get_visa_data, name='get_visa_data'),
     path('filter-options/', views.get_filter_options, name='get_filter_options'),
+    path('occupation-trends/', views.get_occupation_trends, name='get_occupation_trends'),
+    path('search/', views.search, name='search'),
 ]
\ No newline at end of file
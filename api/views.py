@@ -1,71 +1,36 @@
 from django.http import JsonResponse
-from django.db.models import Q
-from data.models import VisaData, VisaType, Occupation, MonthYear
+from core.db_routers import read_from_replica
+from data.search import SEARCH_MODELS
+from .cache import cached_json_response
+from .payloads import visa_data_payload, filter_options_payload, occupation_trends_payload, search_payload
 
+VISA_DATA_FILTERS = ('visa_type', 'occupation', 'eoi_status', 'points')
+VISA_DATA_SINGLE_VALUE_FILTERS = ('month_year',)
+OCCUPATION_TREND_FILTERS = ('visa_type', 'occupation')
+SEARCH_SINGLE_VALUE_FILTERS = ('q', 'kind', 'limit')
 
-def get_visa_data(request):
-    queryset = VisaData.objects.select_related('month_year', 'visa_type', 'occupation').all()
-
-    # Handle multiple visa types
-    visa_types = request.GET.getlist('visa_type')
-    if visa_types:
-        queryset = queryset.filter(visa_type__name__in=visa_types)
-
-    # Handle multiple occupations
-    occupations = request.GET.getlist('occupation')
-    if occupations:
-        queryset = queryset.filter(occupation__name__in=occupations)
-
-    # Handle multiple EOI statuses
-    eoi_statuses = request.GET.getlist('eoi_status')
-    if eoi_statuses:
-        queryset = queryset.filter(status__in=eoi_statuses)
 
-    # Handle multiple points
-    points_list = request.GET.getlist('points')
-    if points_list:
-        try:
-            points_values = [int(p) for p in points_list]
-            queryset = queryset.filter(points__in=points_values)
-        except ValueError:
-            pass
+@read_from_replica
+def get_visa_data(request):
+    return cached_json_response(
+        request, 'visa-data', VISA_DATA_FILTERS, visa_data_payload, VISA_DATA_SINGLE_VALUE_FILTERS
+    )
 
-    # Handle month year (single value)
-    month_year = request.GET.get('month_year')
-    if month_year:
-        queryset = queryset.filter(month_year__name__icontains=month_year)
 
-    data = []
-    for record in queryset:
-        data.append({
-            'id': record.id,
-            'month_year': record.month_year.name,
-            'visa_type': record.visa_type.name,
-            'occupation': record.occupation.name,
-            'eoi_status': record.status,
-            'points': record.points,
-            'count_eois': record.count
-        })
+@read_from_replica
+def get_filter_options(request):
+    return cached_json_response(request, 'filter-options', (), lambda params: filter_options_payload())
 
-    return JsonResponse({
-        'count': len(data),
-        'results': data
-    })
 
+@read_from_replica
+def get_occupation_trends(request):
+    return cached_json_response(request, 'occupation-trends', OCCUPATION_TREND_FILTERS, occupation_trends_payload)
 
-def get_filter_options(request):
-    visa_types = list(VisaType.objects.values_list('name', flat=True).distinct())
-    occupations = list(Occupation.objects.values_list('name', flat=True).distinct())
-    month_years = list(MonthYear.objects.values_list('name', flat=True).distinct())
-    eoi_statuses = [choice[0] for choice in VisaData.Status.choices]
 
-    points_range = VisaData.objects.values_list('points', flat=True).distinct().order_by('points')
-    unique_points = list(points_range)
+@read_from_replica
+def search(request):
+    kind = request.GET.get('kind', 'occupation')
+    if kind not in SEARCH_MODELS:
+        return JsonResponse({'error': f'Invalid kind. Use one of: {", ".join(SEARCH_MODELS)}'}, status=400)
 
-    return JsonResponse({
-        'visa_types': visa_types,
-        'occupations': occupations,
-        'month_years': month_years,
-        'eoi_statuses': eoi_statuses,
-        'points': unique_points
-    })
+    return cached_json_response(request, 'search', (), search_payload, SEARCH_SINGLE_VALUE_FILTERS)
@@ -0,0 +1,57 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_DATABASE = 'replica'
+PRIMARY_PIN_KEY = 'database-primary-pinned'
+
+_state = threading.local()
+
+
+def pin_reads_to_primary():
+    """Send replica reads to the primary for a while, e.g. right after an import wrote new data."""
+    cache.set(PRIMARY_PIN_KEY, True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica, unless there is none or reads are pinned."""
+    previous = getattr(_state, 'use_replica', False)
+    _state.use_replica = REPLICA_DATABASE in settings.DATABASES and not cache.get(PRIMARY_PIN_KEY)
+    try:
+        yield
+    finally:
+        _state.use_replica = previous
+
+
+def read_from_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Reads opted in with replica_reads() go to the replica; everything else, including all writes,
+    admin and imports, stays on the default (primary) database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'use_replica', False):
+            return REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and receives its schema from it
+        return db != REPLICA_DATABASE
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.compression.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,6 +96,51 @@ DATABASES = {
     )
 }
 
+# Optional read replica for API reads; imports, admin and all writes stay on the primary
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'],
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# How long reads stay on the primary after an import, so the replica can catch up
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DATABASE_REPLICA_PIN_SECONDS', 60))
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use a shared Redis cache when available so every worker sees the same cached API payloads
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+    API_CACHE_SHARED = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    API_CACHE_SHARED = False
+
+# Cached API payloads are also keyed on the data version, which every import bumps. A per-worker
+# cache never sees an import run by another worker, so without Redis entries only live briefly.
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 60 * 60 if API_CACHE_SHARED else 10))
+
+# Identical concurrent API queries wait for one computation instead of each running it
+API_COALESCE_TIMEOUT = int(os.environ.get('API_COALESCE_TIMEOUT', 30))
+API_COALESCE_POLL_INTERVAL = 0.05
+
+# Store VisaData in one Postgres partition per month (see `manage.py partition_visadata`)
+VISA_DATA_PARTITIONED = os.environ.get('VISA_DATA_PARTITIONED', 'False').lower() == 'true'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,6 +186,15 @@ STATICFILES_DIRS = [
 # WhiteNoise configuration
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Precomputed dashboard snapshots (see `manage.py export_snapshots`)
+SNAPSHOT_ROOT = Path(os.environ.get('SNAPSHOT_ROOT', STATIC_ROOT / 'snapshots'))
+SNAPSHOT_EXPORT_ON_IMPORT = os.environ.get('SNAPSHOT_EXPORT_ON_IMPORT', 'False').lower() == 'true'
+
+# Imports run inside web requests, so gunicorn kills a stuck one after --timeout (the Procfile passes
+# WEB_WORKER_TIMEOUT); a claim untouched for longer than this belongs to a dead worker and can be resumed
+WEB_WORKER_TIMEOUT = int(os.environ.get('WEB_WORKER_TIMEOUT', 120))
+IMPORT_CLAIM_TIMEOUT = int(os.environ.get('IMPORT_CLAIM_TIMEOUT', WEB_WORKER_TIMEOUT + 30))
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
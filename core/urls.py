@@ -38,7 +38,9 @@ def api_root(request):
             'admin': '/admin/',
             'api': '/api/',
             'filter_options': '/api/filter-options/',
-            'visa_data': '/api/visa-data/'
+            'visa_data': '/api/visa-data/',
+            'occupation_trends': '/api/data/occupation-trends/',
+            'search': '/api/data/search/'
         },
         'frontend': 'https://ausvisa.vercel.app',
         'status': 'healthy'
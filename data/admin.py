@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import VisaType, Occupation, MonthYear, VisaData
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.db.models import Q
+from .models import VisaType, Occupation, MonthYear, VisaData, OccupationTrend
+from .paginators import EstimatedCountPaginator
+from .services import get_points_facet
 
 
 @admin.register(VisaType)
@@ -18,18 +22,41 @@ class OccupationAdmin(admin.ModelAdmin):
 
 @admin.register(MonthYear)
 class MonthYearAdmin(admin.ModelAdmin):
-    list_display = ('name',)
+    list_display = ('name', 'date')
     search_fields = ('name',)
-    ordering = ('-name',)
+    ordering = ('-date', '-name')
+
+
+class PointsListFilter(admin.SimpleListFilter):
+    title = 'points'
+    parameter_name = 'points'
+
+    def lookups(self, request, model_admin):
+        # Cached per data version instead of a DISTINCT over the fact table on every page load
+        return [(points, points) for points in get_points_facet()]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        try:
+            return queryset.filter(points=int(self.value()))
+        except ValueError as e:
+            # Shown as the admin's usual "?e=1" invalid-filter redirect
+            raise IncorrectLookupParameters(e)
 
 
 @admin.register(VisaData)
 class VisaDataAdmin(admin.ModelAdmin):
-    list_display = ('month_year', 'visa_type', 'occupation', 'status', 'points', 'count')
-    list_filter = ('visa_type', 'status', 'month_year', 'points')
+    list_display = ('month', 'visa_type', 'occupation', 'status', 'points', 'count')
+    list_filter = ('visa_type', 'status', 'month_year', PointsListFilter)
     search_fields = ('visa_type__name', 'occupation__name')
     list_select_related = ('month_year', 'visa_type', 'occupation')
-    ordering = ('-month_year__name', 'visa_type__name', 'occupation__name')
+    # Served by the visadata_changelist_idx index instead of a sort over joined name columns. This is
+    # newest-imported month first, then visa type and occupation in creation order (not alphabetical);
+    # sort by the Month column for calendar order, at the cost of a sort over the joined table.
+    ordering = ('-month_year_id', '-visa_type_id', '-occupation_id', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Basic Information', {
@@ -41,3 +68,29 @@ class VisaDataAdmin(admin.ModelAdmin):
     )
 
     list_per_page = 50
+
+    def month(self, obj):
+        return obj.month_year
+    month.short_description = 'Month'
+    month.admin_order_field = 'month_year__date'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Match names on the small dimension tables, then filter the fact table by foreign key
+        if not search_term:
+            return queryset, False
+        visa_type_ids = VisaType.objects.filter(name__icontains=search_term).values('id')
+        occupation_ids = Occupation.objects.filter(name__icontains=search_term).values('id')
+        queryset = queryset.filter(Q(visa_type_id__in=visa_type_ids) | Q(occupation_id__in=occupation_ids))
+        return queryset, False
+
+
+@admin.register(OccupationTrend)
+class OccupationTrendAdmin(admin.ModelAdmin):
+    list_display = (
+        'month_year', 'visa_type', 'occupation', 'min_invited_points',
+        'min_invited_points_change', 'invited_count', 'invited_count_change',
+    )
+    list_filter = ('visa_type', 'month_year')
+    list_select_related = ('month_year', 'visa_type', 'occupation')
+    ordering = ('-month_year__date', 'visa_type__name', 'occupation__name')
+    list_per_page = 50
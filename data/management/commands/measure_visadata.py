@@ -0,0 +1,62 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from data.models import VisaData
+
+
+class Command(BaseCommand):
+    help = 'Report VisaData table and index size and time a full-table aggregate scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Number of timed scans')
+
+    def handle(self, *args, **options):
+        table = VisaData._meta.db_table
+        self.stdout.write(f'Rows: {VisaData.objects.count()}')
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # pg_partition_tree also covers the month partitions when VisaData is partitioned
+                cursor.execute(
+                    'SELECT SUM(pg_table_size(relid)), SUM(pg_indexes_size(relid)) '
+                    'FROM pg_partition_tree(%s::regclass)',
+                    [table],
+                )
+                table_size, index_size = cursor.fetchone()
+            self.stdout.write(f'Table size: {table_size / 1024:.1f} KiB')
+            self.stdout.write(f'Index size: {index_size / 1024:.1f} KiB')
+        elif connection.vendor == 'sqlite' and self.sqlite_has_dbstat():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [table])
+                table_size = cursor.fetchone()[0] or 0
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table],
+                )
+                index_size = cursor.fetchone()[0] or 0
+            self.stdout.write(f'Table size: {table_size / 1024:.1f} KiB')
+            self.stdout.write(f'Index size: {index_size / 1024:.1f} KiB')
+        else:
+            self.stdout.write(f'Table and index sizes are not reported on {connection.vendor}.')
+
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            list(VisaData.objects.values('status').annotate(total=Sum('count')).order_by())
+            timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f'Full scan by status: best {min(timings) * 1000:.1f} ms, '
+            f'mean {sum(timings) / len(timings) * 1000:.1f} ms over {len(timings)} runs'
+        )
+
+    def sqlite_has_dbstat(self):
+        # The dbstat virtual table is only there when SQLite was built with SQLITE_ENABLE_DBSTAT_VTAB
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute('SELECT 1 FROM dbstat LIMIT 1')
+            except DatabaseError:
+                return False
+        return True
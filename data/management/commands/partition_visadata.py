@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from data.partitioning import convert_to_partitioned_table, is_partitioned_table
+
+
+class Command(BaseCommand):
+    help = 'Convert the VisaData table into a Postgres table partitioned by month'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Month partitioning is only supported on PostgreSQL.')
+        if not settings.VISA_DATA_PARTITIONED:
+            raise CommandError('Set VISA_DATA_PARTITIONED=True before converting the VisaData table.')
+
+        if is_partitioned_table():
+            self.stdout.write('VisaData is already partitioned.')
+            return
+
+        try:
+            with transaction.atomic():
+                convert_to_partitioned_table()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS('VisaData is now partitioned by month.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from data.services import rebuild_occupation_trends
+
+
+class Command(BaseCommand):
+    help = 'Recompute the occupation trend table from the current VisaData rows'
+
+    def handle(self, *args, **options):
+        total = rebuild_occupation_trends()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} occupation trend rows.'))
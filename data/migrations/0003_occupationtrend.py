@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0002_monthyear_alter_visadata_month_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_invited_points', models.IntegerField(blank=True, null=True)),
+                ('invited_count', models.IntegerField(default=0)),
+                ('min_invited_points_change', models.IntegerField(blank=True, null=True)),
+                ('invited_count_change', models.IntegerField(blank=True, null=True)),
+                ('month_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='data.monthyear')),
+                ('occupation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='data.occupation')),
+                ('visa_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='data.visatype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('visa_type', 'occupation', 'month_year'), name='unique_occupation_trend')],
+            },
+        ),
+    ]
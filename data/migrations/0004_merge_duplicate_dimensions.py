@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:40
+
+from django.db import migrations
+
+
+DIMENSIONS = (
+    ('VisaType', 'visa_type'),
+    ('Occupation', 'occupation'),
+    ('MonthYear', 'month_year'),
+)
+
+
+def merge_duplicate_dimensions(apps, schema_editor):
+    VisaData = apps.get_model('data', 'VisaData')
+    OccupationTrend = apps.get_model('data', 'OccupationTrend')
+
+    for model_name, field_name in DIMENSIONS:
+        Dimension = apps.get_model('data', model_name)
+        keep_by_name = {}
+        for dimension in Dimension.objects.order_by('id'):
+            keep = keep_by_name.setdefault(dimension.name, dimension)
+            if keep.pk == dimension.pk:
+                continue
+            VisaData.objects.filter(**{field_name: dimension}).update(**{field_name: keep})
+            # Trends are derived data; the next rebuild recomputes the merged series
+            OccupationTrend.objects.filter(**{field_name: dimension}).delete()
+            dimension.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0003_occupationtrend'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_dimensions, migrations.RunPython.noop),
+    ]
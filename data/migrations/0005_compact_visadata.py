@@ -0,0 +1,89 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+STATUS_CODES = {
+    'SUBMITTED': 1,
+    'HOLD': 2,
+    'INVITED': 3,
+    'LODGED': 4,
+    'CLOSED': 5,
+}
+
+
+def encode_status(apps, schema_editor):
+    VisaData = apps.get_model('data', 'VisaData')
+    for name, code in STATUS_CODES.items():
+        VisaData.objects.filter(status=name).update(status_code=code)
+
+
+def decode_status(apps, schema_editor):
+    VisaData = apps.get_model('data', 'VisaData')
+    for name, code in STATUS_CODES.items():
+        VisaData.objects.filter(status_code=code).update(status=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0004_merge_duplicate_dimensions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monthyear',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='occupation',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='visatype',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddField(
+            model_name='visadata',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='visadata',
+            name='status',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(encode_status, decode_status),
+        migrations.RemoveField(
+            model_name='visadata',
+            name='status',
+        ),
+        migrations.RenameField(
+            model_name='visadata',
+            old_name='status_code',
+            new_name='status',
+        ),
+        migrations.AlterField(
+            model_name='visadata',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'SUBMITTED'), (2, 'HOLD'), (3, 'INVITED'), (4, 'LODGED'), (5, 'CLOSED')]),
+        ),
+        migrations.AlterField(
+            model_name='visadata',
+            name='points',
+            field=models.PositiveSmallIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='occupationtrend',
+            name='min_invited_points',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='occupationtrend',
+            name='min_invited_points_change',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+    ]
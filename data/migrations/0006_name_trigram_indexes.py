@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:20
+
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = (
+    ('data_visatype_name_trgm', 'data_visatype'),
+    ('data_occupation_name_trgm', 'data_occupation'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm only exists on Postgres; elsewhere search uses the in-process prefix index
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} USING gin (name gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0005_compact_visadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
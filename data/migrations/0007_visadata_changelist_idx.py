@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0006_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visadata',
+            index=models.Index(fields=['month_year', 'visa_type', 'occupation', 'id'], name='visadata_changelist_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:15
+
+import datetime
+
+from django.db import migrations, models
+
+
+MONTH_YEAR_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m', '%Y/%m', '%m/%Y', '%m-%Y', '%d/%m/%Y',
+    '%b-%Y', '%B-%Y', '%b %Y', '%B %Y', '%b-%y', '%B-%y',
+)
+
+
+def populate_month_dates(apps, schema_editor):
+    MonthYear = apps.get_model('data', 'MonthYear')
+    for month_year in MonthYear.objects.filter(date__isnull=True):
+        for month_year_format in MONTH_YEAR_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(month_year.name.strip(), month_year_format)
+            except ValueError:
+                continue
+            month_year.date = parsed.date().replace(day=1)
+            month_year.save(update_fields=['date'])
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0007_visadata_changelist_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthyear',
+            name='date',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(populate_month_dates, migrations.RunPython.noop),
+    ]
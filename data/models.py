@@ -1,38 +1,89 @@
+import datetime
+
 from django.db import models
 
+# Formats seen in the "As At Month" column, as written by pandas or typed into the sheet
+MONTH_YEAR_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m', '%Y/%m', '%m/%Y', '%m-%Y', '%d/%m/%Y',
+    '%b-%Y', '%B-%Y', '%b %Y', '%B %Y', '%b-%y', '%B-%y',
+)
+
+
+def parse_month_year(name):
+    """First day of the month a MonthYear name refers to, or None when it cannot be parsed."""
+    for month_year_format in MONTH_YEAR_FORMATS:
+        try:
+            return datetime.datetime.strptime(name.strip(), month_year_format).date().replace(day=1)
+        except ValueError:
+            continue
+    return None
+
+
 class VisaType(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return self.name
 
 class Occupation(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return self.name
 
 class MonthYear(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
+    # Chronological sort key; names such as "Dec-2023" do not sort as strings
+    date = models.DateField(null=True, blank=True, db_index=True)
+
+    def save(self, *args, **kwargs):
+        if self.date is None:
+            self.date = parse_month_year(self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 class VisaData(models.Model):
-    class Status(models.TextChoices):
-        SUBMITTED = 'SUBMITTED'
-        HOLD = 'HOLD'
-        INVITED = 'INVITED'
-        LODGED = 'LODGED'
-        CLOSED = 'CLOSED'
+    class Status(models.IntegerChoices):
+        SUBMITTED = 1, 'SUBMITTED'
+        HOLD = 2, 'HOLD'
+        INVITED = 3, 'INVITED'
+        LODGED = 4, 'LODGED'
+        CLOSED = 5, 'CLOSED'
 
 
     month_year = models.ForeignKey(MonthYear, on_delete=models.CASCADE)
     visa_type = models.ForeignKey(VisaType, on_delete=models.CASCADE)
     occupation = models.ForeignKey(Occupation, on_delete=models.CASCADE)
-    status = models.CharField(max_length=255, choices=Status.choices)
-    points = models.IntegerField()
+    status = models.PositiveSmallIntegerField(choices=Status.choices)
+    points = models.PositiveSmallIntegerField()
     count = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['month_year', 'visa_type', 'occupation', 'id'], name='visadata_changelist_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month_year} - {self.visa_type} - {self.occupation}"
+
+class OccupationTrend(models.Model):
+    month_year = models.ForeignKey(MonthYear, on_delete=models.CASCADE)
+    visa_type = models.ForeignKey(VisaType, on_delete=models.CASCADE)
+    occupation = models.ForeignKey(Occupation, on_delete=models.CASCADE)
+    min_invited_points = models.PositiveSmallIntegerField(null=True, blank=True)
+    invited_count = models.IntegerField(default=0)
+    min_invited_points_change = models.SmallIntegerField(null=True, blank=True)
+    invited_count_change = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['visa_type', 'occupation', 'month_year'],
+                name='unique_occupation_trend',
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.month_year} - {self.visa_type} - {self.occupation}"
\ No newline at end of file
+        return f"{self.month_year} - {self.visa_type} - {self.occupation} trend"
@@ -0,0 +1,29 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the Postgres planner's row estimate instead of an exact COUNT(*) for an
+    unfiltered queryset once the table is larger than estimate_threshold rows.
+    """
+
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                # pg_partition_tree sums the month partitions when VisaData is partitioned
+                cursor.execute(
+                    'SELECT SUM(GREATEST(c.reltuples, 0))::bigint FROM pg_partition_tree(%s::regclass) AS t '
+                    'JOIN pg_class AS c ON c.oid = t.relid',
+                    [queryset.model._meta.db_table],
+                )
+                estimate = cursor.fetchone()[0] or 0
+            if estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,201 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import UniqueConstraint
+from .models import MonthYear, VisaData
+
+
+# Connection attribute memoising whether data_visadata is partitioned; reset on every new connection
+PARTITIONED_ATTRIBUTE = 'visa_data_partitioned'
+
+
+def is_partitioned_table():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [VisaData._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def partitioning_enabled():
+    """
+    VisaData is list-partitioned by month only on Postgres with VISA_DATA_PARTITIONED on, and only
+    once partition_visadata has converted the table; the flag is switched on before that runs.
+    """
+    if not settings.VISA_DATA_PARTITIONED or connection.vendor != 'postgresql':
+        return False
+    connection.ensure_connection()
+    partitioned = getattr(connection, PARTITIONED_ATTRIBUTE, None)
+    if partitioned is None:
+        partitioned = is_partitioned_table()
+        setattr(connection, PARTITIONED_ATTRIBUTE, partitioned)
+    return partitioned
+
+
+def partition_name(month_year_id):
+    return f'{VisaData._meta.db_table}_m{month_year_id}'
+
+
+def ensure_month_partition(month_year):
+    """
+    Create the partition for a month if it is missing. Rows for the month that already landed in
+    the default partition are moved into it first, since Postgres refuses to attach a partition
+    while the default one holds matching rows.
+    """
+    if not partitioning_enabled():
+        return
+
+    table = connection.ops.quote_name(VisaData._meta.db_table)
+    partition = connection.ops.quote_name(partition_name(month_year.pk))
+    default_partition = connection.ops.quote_name(f'{VisaData._meta.db_table}_default')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [partition_name(month_year.pk)])
+        if cursor.fetchone()[0] is not None:
+            return
+        cursor.execute(f'CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default_partition} WHERE month_year_id = %s RETURNING *) '
+            f'INSERT INTO {partition} SELECT * FROM moved',
+            [month_year.pk],
+        )
+        cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES IN (%s)', [month_year.pk])
+
+
+def staging_name(month_year_id):
+    return f'{partition_name(month_year_id)}_staging'
+
+
+@contextmanager
+def replacing_months(month_years):
+    """
+    Replace every VisaData row of the given months with the rows inserted inside the block, all or
+    nothing. Yields the function to insert VisaData objects with.
+
+    When partitioned, rows of the replaced months are loaded into detached staging tables that are
+    swapped in for the month partitions with DETACH/ATTACH once the block succeeds, so readers keep
+    seeing the old month until then and the old rows are dropped rather than deleted. Otherwise the
+    old rows are deleted and the new ones inserted in a single transaction.
+    """
+    if not partitioning_enabled():
+        with transaction.atomic():
+            VisaData.objects.filter(month_year__in=month_years).delete()
+            yield lambda objects: VisaData.objects.bulk_create(objects, ignore_conflicts=True)
+        return
+
+    table = connection.ops.quote_name(VisaData._meta.db_table)
+    staged = {month_year.pk for month_year in month_years}
+    with connection.cursor() as cursor:
+        for month_year_id in staged:
+            staging = connection.ops.quote_name(staging_name(month_year_id))
+            cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+            cursor.execute(f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+            # Lets ATTACH PARTITION skip scanning the table to validate the partition bound
+            bound = connection.ops.quote_name(f'{staging_name(month_year_id)}_bound')
+            cursor.execute(f'ALTER TABLE {staging} ADD CONSTRAINT {bound} CHECK (month_year_id = {int(month_year_id)})')
+
+    def insert(objects):
+        staged_objects = {}
+        other_objects = []
+        for obj in objects:
+            if obj.month_year_id in staged:
+                staged_objects.setdefault(obj.month_year_id, []).append(obj)
+            else:
+                other_objects.append(obj)
+        if other_objects:
+            VisaData.objects.bulk_create(other_objects, ignore_conflicts=True)
+        for month_year_id, month_objects in staged_objects.items():
+            _insert_into(staging_name(month_year_id), month_objects)
+
+    try:
+        yield insert
+    except BaseException:
+        with connection.cursor() as cursor:
+            for month_year_id in staged:
+                cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(staging_name(month_year_id))}')
+        raise
+
+    for month_year in month_years:
+        ensure_month_partition(month_year)
+    # ATTACH builds the partition's indexes, so the swap holds its locks for about one month's index build
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month_year_id in staged:
+            partition = connection.ops.quote_name(partition_name(month_year_id))
+            staging = connection.ops.quote_name(staging_name(month_year_id))
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {partition}')
+            cursor.execute(f'DROP TABLE {partition}')
+            cursor.execute(f'ALTER TABLE {staging} RENAME TO {partition}')
+            cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES IN (%s)', [month_year_id])
+            bound = connection.ops.quote_name(f'{staging_name(month_year_id)}_bound')
+            cursor.execute(f'ALTER TABLE {partition} DROP CONSTRAINT {bound}')
+
+
+def _insert_into(db_table, objects):
+    fields = [field for field in VisaData._meta.concrete_fields if not field.primary_key]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(db_table)} ({columns}) VALUES ({placeholders})',
+            [[field.get_db_prep_save(getattr(obj, field.attname), connection) for field in fields] for obj in objects],
+        )
+
+
+def convert_to_partitioned_table():
+    """
+    Rebuild data_visadata as a table partitioned by month_year_id, copying existing rows.
+
+    CHECK constraints are copied from the old table and the indexes in VisaData.Meta are recreated,
+    so the schema still matches the migration state.
+    """
+    if any(isinstance(constraint, UniqueConstraint) for constraint in VisaData._meta.constraints):
+        # Postgres only allows unique constraints on a partitioned table that include the partition key
+        raise ValueError('VisaData has unique constraints, which cannot be kept on a partitioned table.')
+
+    table = connection.ops.quote_name(VisaData._meta.db_table)
+    heap = connection.ops.quote_name(f'{VisaData._meta.db_table}_heap')
+    sequence = connection.ops.quote_name(f'{VisaData._meta.db_table}_partitioned_id_seq')
+    default_partition = connection.ops.quote_name(f'{VisaData._meta.db_table}_default')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {heap}')
+        cursor.execute(
+            f'CREATE TABLE {table} (LIKE {heap} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY LIST (month_year_id)'
+        )
+        # Unique constraints on a partitioned table must include the partition key.
+        cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, month_year_id)')
+        cursor.execute(f'CREATE SEQUENCE {sequence} OWNED BY {table}.id')
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        for field in ('month_year', 'visa_type', 'occupation'):
+            column = VisaData._meta.get_field(field).column
+            target = VisaData._meta.get_field(field).related_model._meta.db_table
+            cursor.execute(
+                f'ALTER TABLE {table} ADD FOREIGN KEY ({column}) '
+                f'REFERENCES {connection.ops.quote_name(target)} (id) DEFERRABLE INITIALLY DEFERRED'
+            )
+        cursor.execute(f'CREATE TABLE {default_partition} PARTITION OF {table} DEFAULT')
+
+        # Every known month gets its partition, including months that have no rows yet
+        cursor.execute(f'SELECT id FROM {connection.ops.quote_name(MonthYear._meta.db_table)}')
+        for (month_year_id,) in cursor.fetchall():
+            cursor.execute(
+                f'CREATE TABLE {connection.ops.quote_name(partition_name(month_year_id))} '
+                f'PARTITION OF {table} FOR VALUES IN (%s)',
+                [month_year_id],
+            )
+
+        cursor.execute(f'INSERT INTO {table} SELECT * FROM {heap}')
+        cursor.execute(f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)")
+        # Dropping the old table frees its index names for the recreated indexes
+        cursor.execute(f'DROP TABLE {heap}')
+
+        for field in ('month_year', 'visa_type', 'occupation'):
+            cursor.execute(f'CREATE INDEX ON {table} ({VisaData._meta.get_field(field).column})')
+
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for index in VisaData._meta.indexes:
+            schema_editor.add_index(VisaData, index)
+
+    setattr(connection, PARTITIONED_ATTRIBUTE, None)
@@ -0,0 +1,124 @@
+import difflib
+import re
+from bisect import bisect_left
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.lookups import PostgresOperatorLookup
+from .models import VisaType, Occupation
+from .services import get_data_version
+
+SEARCH_MODELS = {
+    'occupation': Occupation,
+    'visa_type': VisaType,
+}
+
+# Ranks, best first
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+
+WORD = re.compile(r'[^\W_]+')
+# The same word start as WORD, in Postgres regex syntax: the start of the name or a non-alphanumeric
+POSTGRES_WORD_START = r'(^|[^[:alnum:]])'
+
+
+class PrefixIndex:
+    """
+    Sorted index of names and of every word suffix in them, for prefix lookups by bisection.
+    Words are runs of letters and digits, so "(Aged Care)" or "Engineer/Manager" split too.
+    """
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self.lowered = {name: name.lower() for name in self.names}
+        self.keys = []
+        # Full names and single words, mapped to the names they come from, for fuzzy matching
+        self.fuzzy_candidates = {}
+        for name, lowered in self.lowered.items():
+            self.keys.append((lowered, name))
+            self.fuzzy_candidates.setdefault(lowered, set()).add(name)
+            for word in WORD.finditer(lowered):
+                if word.start():
+                    self.keys.append((lowered[word.start():], name))
+                self.fuzzy_candidates.setdefault(word.group(), set()).add(name)
+        self.keys.sort()
+
+    def search(self, query, limit):
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        ranks = {}
+        position = bisect_left(self.keys, (query,))
+        while position < len(self.keys) and self.keys[position][0].startswith(query):
+            key, name = self.keys[position]
+            position += 1
+            if self.lowered[name] == query:
+                rank = EXACT
+            elif self.lowered[name] == key:
+                rank = PREFIX
+            else:
+                rank = WORD_PREFIX
+            ranks[name] = min(rank, ranks.get(name, FUZZY))
+
+        if len(ranks) < limit:
+            for candidate in difflib.get_close_matches(query, self.fuzzy_candidates, n=limit, cutoff=0.6):
+                for name in self.fuzzy_candidates[candidate]:
+                    ranks.setdefault(name, FUZZY)
+
+        return sorted(ranks, key=lambda name: (ranks[name], name))[:limit]
+
+
+_prefix_indexes = {}
+
+
+def get_prefix_index(kind):
+    """The prefix index for a dimension, rebuilt whenever an import bumps the data version."""
+    version = get_data_version()
+    cached = _prefix_indexes.get(kind)
+    if cached is None or cached[0] != version:
+        names = SEARCH_MODELS[kind].objects.values_list('name', flat=True)
+        cached = _prefix_indexes[kind] = (version, PrefixIndex(names))
+    return cached[1]
+
+
+class ILike(PostgresOperatorLookup):
+    """
+    Literal "name ILIKE pattern", which a gin_trgm_ops index on name can serve. The built-in
+    icontains lookup compiles to UPPER(name) LIKE UPPER(...) on Postgres, which it cannot.
+    """
+
+    lookup_name = 'ilike'
+    postgres_operator = 'ILIKE'
+
+
+def trigram_search_queryset(kind, query):
+    """Postgres search: ILIKE and % (similarity) are both served by the gin_trgm_ops name indexes."""
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    pattern = f'%{connection.ops.prep_for_like_query(query)}%'
+    return (
+        SEARCH_MODELS[kind].objects
+        .filter(Q(ILike(F('name'), pattern)) | Q(TrigramSimilar(F('name'), query)))
+        .annotate(
+            rank=Case(
+                When(name__iexact=query, then=Value(EXACT)),
+                When(name__istartswith=query, then=Value(PREFIX)),
+                When(name__iregex=POSTGRES_WORD_START + re.escape(query), then=Value(WORD_PREFIX)),
+                default=Value(FUZZY),
+                output_field=IntegerField(),
+            ),
+            similarity=TrigramSimilarity('name', query),
+        )
+        .order_by('rank', '-similarity', 'name')
+    )
+
+
+def search_names(kind, query, limit=10):
+    """Ranked prefix and fuzzy matches for an occupation or visa type name."""
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor != 'postgresql':
+        return get_prefix_index(kind).search(query, limit)
+    return list(trigram_search_queryset(kind, query).values_list('name', flat=True)[:limit])
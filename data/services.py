@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Min, Q, Sum, Window
+from django.db.models.functions import Coalesce, Lag
+from core.db_routers import pin_reads_to_primary
+from .models import VisaData, OccupationTrend
+
+
+DATA_VERSION_KEY = 'visa-data-version'
+
+
+def get_data_version():
+    """Token that changes whenever imported data changes; API cache keys include it."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        version = bump_data_version()
+    return version
+
+
+def bump_data_version():
+    version = time.time_ns()
+    # A per-worker cache cannot see another worker's bump, so there the version also rolls over
+    timeout = None if settings.API_CACHE_SHARED else settings.API_CACHE_TIMEOUT
+    cache.set(DATA_VERSION_KEY, version, timeout)
+    return version
+
+
+def get_points_facet():
+    """Distinct points values, computed once per data version."""
+    return cache.get_or_set(
+        f'visa-data-points:{get_data_version()}',
+        lambda: list(VisaData.objects.values_list('points', flat=True).distinct().order_by('points')),
+        settings.API_CACHE_TIMEOUT,
+    )
+
+
+def rebuild_occupation_trends():
+    """Recompute the per-month occupation trend table from VisaData in one query."""
+    invited = Q(status=VisaData.Status.INVITED)
+    series = [F('visa_type_id'), F('occupation_id')]
+    month_order = [F('month_year__date').asc(nulls_last=True), F('month_year__name').asc()]
+    min_invited_points = Min('points', filter=invited)
+    invited_count = Coalesce(Sum('count', filter=invited), 0)
+
+    rows = (
+        VisaData.objects
+        .values('month_year_id', 'visa_type_id', 'occupation_id')
+        .annotate(
+            min_invited_points=min_invited_points,
+            invited_count=invited_count,
+        )
+        .annotate(
+            previous_min_invited_points=Window(
+                Lag(min_invited_points), partition_by=series, order_by=month_order
+            ),
+            previous_invited_count=Window(
+                Lag(invited_count), partition_by=series, order_by=month_order
+            ),
+        )
+        .order_by()
+    )
+
+    trends = []
+    for row in rows:
+        previous_points = row['previous_min_invited_points']
+        previous_count = row['previous_invited_count']
+        trends.append(OccupationTrend(
+            month_year_id=row['month_year_id'],
+            visa_type_id=row['visa_type_id'],
+            occupation_id=row['occupation_id'],
+            min_invited_points=row['min_invited_points'],
+            invited_count=row['invited_count'],
+            min_invited_points_change=(
+                row['min_invited_points'] - previous_points
+                if row['min_invited_points'] is not None and previous_points is not None else None
+            ),
+            invited_count_change=(
+                row['invited_count'] - previous_count if previous_count is not None else None
+            ),
+        ))
+
+    with transaction.atomic():
+        OccupationTrend.objects.all().delete()
+        OccupationTrend.objects.bulk_create(trends, batch_size=1000)
+
+    return len(trends)
+
+
+def refresh_after_import():
+    """Bring derived data up to date once an import has written new VisaData rows."""
+    rebuild_occupation_trends()
+    # Payloads for the new data version must not be built from a lagging replica
+    pin_reads_to_primary()
+    bump_data_version()
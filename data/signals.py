@@ -0,0 +1,18 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import MonthYear
+from .partitioning import PARTITIONED_ATTRIBUTE, ensure_month_partition
+
+
+@receiver(post_save, sender=MonthYear)
+def create_month_partition(sender, instance, created, **kwargs):
+    # Months created anywhere (admin, shell, importer) get their partition before rows arrive
+    if created:
+        ensure_month_partition(instance)
+
+
+@receiver(connection_created)
+def forget_partitioning_state(sender, connection, **kwargs):
+    # partition_visadata may have converted the table since this worker last connected
+    setattr(connection, PARTITIONED_ATTRIBUTE, None)
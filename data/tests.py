@@ -1,3 +1,156 @@
-from django.test import TestCase
+import copy
+import datetime
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from data import partitioning
+from data.models import MonthYear, Occupation, OccupationTrend, VisaData, VisaType, parse_month_year
+from data.search import WORD_PREFIX, PrefixIndex, trigram_search_queryset
+from data.services import rebuild_occupation_trends
+
+try:
+    from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+except ImportError:  # psycopg2 is not installed
+    PostgresDatabaseWrapper = None
+
+
+@override_settings(VISA_DATA_PARTITIONED=True)
+class PartitioningEnabledTests(SimpleTestCase):
+    def test_off_until_the_table_is_partitioned(self):
+        postgres = mock.Mock(vendor='postgresql', spec=['vendor', 'ensure_connection'])
+        with mock.patch.object(partitioning, 'connection', postgres), \
+                mock.patch.object(partitioning, 'is_partitioned_table', return_value=False) as is_partitioned:
+            self.assertFalse(partitioning.partitioning_enabled())
+            self.assertFalse(partitioning.partitioning_enabled())
+        # Memoised on the connection, so the catalog is only asked once
+        is_partitioned.assert_called_once_with()
+
+    def test_off_on_other_databases(self):
+        self.assertFalse(partitioning.partitioning_enabled())
+
+
+class ParseMonthYearTests(SimpleTestCase):
+    def test_parses_sheet_formats_to_first_of_month(self):
+        self.assertEqual(parse_month_year('Dec-2023'), datetime.date(2023, 12, 1))
+        self.assertEqual(parse_month_year('2024-01-01 00:00:00'), datetime.date(2024, 1, 1))
+        self.assertEqual(parse_month_year('02/2024'), datetime.date(2024, 2, 1))
+        self.assertIsNone(parse_month_year('sometime'))
+
+
+class OccupationTrendTests(TestCase):
+    def setUp(self):
+        self.visa_type = VisaType.objects.create(name='189')
+        self.occupation = Occupation.objects.create(name='261313 Software Engineer')
+        # Created out of order and named so that string order (Dec, Feb, Jan) is not chronological
+        self.jan = MonthYear.objects.create(name='Jan-2024')
+        self.dec = MonthYear.objects.create(name='Dec-2023')
+        self.feb = MonthYear.objects.create(name='Feb-2024')
+
+    def add(self, month_year, status, points, count, occupation=None):
+        VisaData.objects.create(
+            month_year=month_year, visa_type=self.visa_type, occupation=occupation or self.occupation,
+            status=status, points=points, count=count,
+        )
+
+    def trend(self, month_year, occupation=None):
+        return OccupationTrend.objects.get(month_year=month_year, occupation=occupation or self.occupation)
+
+    def test_min_invited_points_and_invited_count_ignore_other_statuses(self):
+        self.add(self.jan, VisaData.Status.INVITED, 90, 4)
+        self.add(self.jan, VisaData.Status.INVITED, 85, 6)
+        self.add(self.jan, VisaData.Status.SUBMITTED, 65, 500)
+
+        self.assertEqual(rebuild_occupation_trends(), 1)
+        trend = self.trend(self.jan)
+        self.assertEqual(trend.min_invited_points, 85)
+        self.assertEqual(trend.invited_count, 10)
+        self.assertIsNone(trend.min_invited_points_change)
+        self.assertIsNone(trend.invited_count_change)
+
+    def test_month_over_month_changes_follow_calendar_order(self):
+        self.add(self.dec, VisaData.Status.INVITED, 95, 5)
+        self.add(self.jan, VisaData.Status.INVITED, 90, 8)
+        self.add(self.feb, VisaData.Status.INVITED, 100, 2)
+
+        rebuild_occupation_trends()
+
+        self.assertIsNone(self.trend(self.dec).min_invited_points_change)
+        self.assertEqual(self.trend(self.jan).min_invited_points_change, -5)
+        self.assertEqual(self.trend(self.jan).invited_count_change, 3)
+        self.assertEqual(self.trend(self.feb).min_invited_points_change, 10)
+        self.assertEqual(self.trend(self.feb).invited_count_change, -6)
+
+    def test_months_without_invitations_have_no_cutoff(self):
+        other = Occupation.objects.create(name='351311 Chef')
+        self.add(self.dec, VisaData.Status.INVITED, 80, 3, occupation=other)
+        self.add(self.jan, VisaData.Status.SUBMITTED, 70, 40, occupation=other)
+
+        rebuild_occupation_trends()
+
+        trend = self.trend(self.jan, occupation=other)
+        self.assertIsNone(trend.min_invited_points)
+        self.assertIsNone(trend.min_invited_points_change)
+        self.assertEqual(trend.invited_count, 0)
+        self.assertEqual(trend.invited_count_change, -3)
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            '261313 Software Engineer',
+            '261312 Developer Programmer',
+            '254412 Registered Nurse (Aged Care)',
+            '133211 Engineering Manager',
+            'Engineering Technologist/Engineer',
+            '351311 Chef',
+            'Chef',
+        ])
+
+    def test_ranks_exact_then_prefix_then_word_prefix(self):
+        self.assertEqual(self.index.search('chef', 10), ['Chef', '351311 Chef'])
+        self.assertEqual(
+            self.index.search('eng', 10),
+            ['Engineering Technologist/Engineer', '133211 Engineering Manager', '261313 Software Engineer'],
+        )
+
+    def test_words_split_on_punctuation(self):
+        self.assertEqual(self.index.search('aged', 10), ['254412 Registered Nurse (Aged Care)'])
+        self.assertEqual(self.index.search('engineer', 1), ['Engineering Technologist/Engineer'])
+
+    def test_fuzzy_matches_single_words(self):
+        self.assertIn('261313 Software Engineer', self.index.search('enginer', 10))
+        self.assertEqual(self.index.search('programer', 10), ['261312 Developer Programmer'])
+
+    def test_limit_and_blank_query(self):
+        self.assertEqual(len(self.index.search('eng', 2)), 2)
+        self.assertEqual(self.index.search('  ', 10), [])
+
+
+@skipUnless(PostgresDatabaseWrapper, 'psycopg2 is not installed')
+class TrigramSearchSqlTests(SimpleTestCase):
+    def compile(self, queryset):
+        # SQL compilation does not need a running server, only the Postgres backend
+        settings_dict = copy.deepcopy(connection.settings_dict)
+        settings_dict.update(ENGINE='django.db.backends.postgresql', NAME='ausvisa')
+        postgres = PostgresDatabaseWrapper(settings_dict, alias='postgres')
+        return queryset.query.get_compiler(connection=postgres).as_sql()
+
+    def test_where_clause_uses_operators_the_trigram_index_serves(self):
+        sql, params = self.compile(trigram_search_queryset('occupation', 'soft_eng'))
+
+        where = sql[sql.index(' WHERE '):sql.index(' ORDER BY ')]
+        self.assertEqual(
+            where,
+            ' WHERE ("data_occupation"."name" ILIKE %s OR "data_occupation"."name" %% %s)',
+        )
+        self.assertIn('%soft\\_eng%', params)
+
+    def test_word_prefix_rank_starts_words_after_punctuation(self):
+        sql, params = self.compile(trigram_search_queryset('occupation', 'aged'))
+
+        # Same word start as PrefixIndex (see PrefixIndexTests.test_words_split_on_punctuation)
+        self.assertIn('WHEN "data_occupation"."name"::text ~* %s THEN %s', sql)
+        self.assertIn('(^|[^[:alnum:]])aged', params)
+        self.assertEqual(params[params.index('(^|[^[:alnum:]])aged') + 1], WORD_PREFIX)
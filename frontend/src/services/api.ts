@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { ApiResponse, FilterOptions, ChartFilters } from '../types/api';
+import { ApiResponse, FilterOptions, ChartFilters, SnapshotManifest, VisaDataRecord } from '../types/api';
 
 const API_BASE_URL = process.env.NODE_ENV === 'production'
   ? 'https://ausvisa-backend.bilt.au/api'
@@ -10,13 +10,73 @@ const api = axios.create({
   timeout: 10000,
 });
 
+// Optional static snapshots exported by `manage.py export_snapshots` (served from a CDN)
+const SNAPSHOT_BASE_URL = process.env.REACT_APP_SNAPSHOT_URL;
+
+let manifestRequest: Promise<SnapshotManifest | null> | null = null;
+
+const loadSnapshotManifest = (): Promise<SnapshotManifest | null> => {
+  if (!SNAPSHOT_BASE_URL) {
+    return Promise.resolve(null);
+  }
+  if (!manifestRequest) {
+    manifestRequest = axios.get<SnapshotManifest>(`${SNAPSHOT_BASE_URL}/manifest.json`, { timeout: 5000 })
+      .then(response => response.data)
+      .catch(() => null);
+  }
+  return manifestRequest;
+};
+
+const loadSnapshot = async <T>(path: string): Promise<T> => {
+  const response = await axios.get<T>(`${SNAPSHOT_BASE_URL}/${path}`);
+  return response.data;
+};
+
+// Snapshots hold every record of one occupation or one visa type; other filters are applied here
+const snapshotPathFor = (manifest: SnapshotManifest, filters: ChartFilters): string | undefined => {
+  if (filters.occupations && filters.occupations.length === 1) {
+    return manifest.occupations[filters.occupations[0]];
+  }
+  if ((!filters.occupations || filters.occupations.length === 0) && filters.visa_types && filters.visa_types.length === 1) {
+    return manifest.visa_types[filters.visa_types[0]];
+  }
+  return undefined;
+};
+
+const matchesFilters = (record: VisaDataRecord, filters: ChartFilters): boolean => (
+  (!filters.visa_types || filters.visa_types.length === 0 || filters.visa_types.includes(record.visa_type)) &&
+  (!filters.points || filters.points.length === 0 || filters.points.includes(record.points)) &&
+  (!filters.eoi_statuses || filters.eoi_statuses.length === 0 || filters.eoi_statuses.includes(record.eoi_status))
+);
+
 export const apiService = {
   async getFilterOptions(): Promise<FilterOptions> {
+    const manifest = await loadSnapshotManifest();
+    if (manifest) {
+      try {
+        return await loadSnapshot<FilterOptions>(manifest.filter_options);
+      } catch (err) {
+        console.error('Error loading filter options snapshot, falling back to the API:', err);
+      }
+    }
+
     const response = await api.get<FilterOptions>('/data/filter-options/');
     return response.data;
   },
 
   async getVisaData(filters: ChartFilters = {}): Promise<ApiResponse> {
+    const manifest = await loadSnapshotManifest();
+    const snapshotPath = manifest ? snapshotPathFor(manifest, filters) : undefined;
+    if (snapshotPath) {
+      try {
+        const snapshot = await loadSnapshot<ApiResponse>(snapshotPath);
+        const results = snapshot.results.filter(record => matchesFilters(record, filters));
+        return { count: results.length, results };
+      } catch (err) {
+        console.error('Error loading visa data snapshot, falling back to the API:', err);
+      }
+    }
+
     const params = new URLSearchParams();
 
     // Handle multiple visa types
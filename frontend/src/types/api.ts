@@ -31,4 +31,12 @@ export interface ChartFilters {
 export interface SelectOption {
   value: string | number;
   label: string;
-}
\ No newline at end of file
+}
+export interface SnapshotManifest {
+  version: string;
+  generated_at: string;
+  filter_options: string;
+  occupation_trends: string;
+  visa_types: Record<string, string>;
+  occupations: Record<string, string>;
+}
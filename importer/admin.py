@@ -5,7 +5,6 @@ from django.urls import path, reverse
 from django.utils.html import format_html
 from django.http import HttpResponseRedirect
 from .models import ExcelImport
-from .services import ExcelImportService
 import os
 
 
@@ -13,7 +12,10 @@ import os
 class ExcelImportAdmin(admin.ModelAdmin):
     list_display = ('file_name', 'uploaded_at', 'processed', 'status_display', 'actions_display')
     list_filter = ('processed', 'uploaded_at')
-    readonly_fields = ('uploaded_at', 'processed', 'total_rows', 'processed_rows', 'errors_count', 'errors_detail')
+    readonly_fields = (
+        'uploaded_at', 'processed', 'total_rows', 'processed_rows', 'checkpoint_rows', 'claimed_at', 'errors_count',
+        'errors_detail',
+    )
     search_fields = ('file',)
     ordering = ['-uploaded_at']
 
@@ -22,7 +24,9 @@ class ExcelImportAdmin(admin.ModelAdmin):
             'fields': ('file',)
         }),
         ('Processing Status', {
-            'fields': ('uploaded_at', 'processed', 'total_rows', 'processed_rows', 'errors_count'),
+            'fields': (
+                'uploaded_at', 'processed', 'total_rows', 'processed_rows', 'checkpoint_rows', 'claimed_at', 'errors_count'
+            ),
             'classes': ('collapse',)
         }),
         ('Error Details', {
@@ -36,7 +40,17 @@ class ExcelImportAdmin(admin.ModelAdmin):
     file_name.short_description = 'File Name'
 
     def status_display(self, obj):
-        if not obj.processed:
+        if not obj.processed and obj.is_being_processed:
+            return format_html(
+                '<span style="color: blue;">⚙ Processing, row {} of {}</span>',
+                obj.checkpoint_rows, obj.total_rows if obj.total_rows is not None else '?'
+            )
+        elif not obj.processed and obj.checkpoint_rows:
+            return format_html(
+                '<span style="color: orange;">⏸ Interrupted at row {} of {}</span>',
+                obj.checkpoint_rows, obj.total_rows
+            )
+        elif not obj.processed:
             return format_html('<span style="color: orange;">⏳ Pending</span>')
         elif obj.errors_count and obj.errors_count > 0:
             return format_html('<span style="color: red;">❌ Completed with errors</span>')
@@ -45,11 +59,14 @@ class ExcelImportAdmin(admin.ModelAdmin):
     status_display.short_description = 'Status'
 
     def actions_display(self, obj):
-        if not obj.processed:
+        if not obj.processed and obj.is_being_processed:
+            return "Processing…"
+        elif not obj.processed:
             process_url = reverse('admin:process_import', args=[obj.pk])
             return format_html(
-                '<a class="button" href="{}">Process Import</a>',
-                process_url
+                '<a class="button" href="{}">{}</a>',
+                process_url,
+                'Resume Import' if obj.checkpoint_rows else 'Process Import'
             )
         else:
             return "Processed"
@@ -74,9 +91,12 @@ class ExcelImportAdmin(admin.ModelAdmin):
                 messages.warning(request, f'Import {import_id} has already been processed.')
                 return HttpResponseRedirect(reverse('admin:importer_excelimport_changelist'))
 
+            # Imported here so web workers only load pandas when an import actually runs
+            from .services import ExcelImportService
+
             # Process the file
             service = ExcelImportService()
-            results = service.process_excel_file(excel_import.file.path)
+            results = service.process_excel_file(excel_import.file.path, excel_import=excel_import)
 
             # Update the import record
             excel_import.processed = True
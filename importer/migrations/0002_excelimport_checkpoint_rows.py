@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('importer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excelimport',
+            name='checkpoint_rows',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('importer', '0002_excelimport_checkpoint_rows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excelimport',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
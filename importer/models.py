@@ -1,4 +1,8 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class ExcelImport(models.Model):
@@ -9,11 +13,23 @@ class ExcelImport(models.Model):
     processed_rows = models.IntegerField(null=True, blank=True)
     errors_count = models.IntegerField(null=True, blank=True)
     errors_detail = models.TextField(blank=True)
+    checkpoint_rows = models.IntegerField(default=0)
+    # Set while a worker is processing the import, so a second click cannot run it concurrently
+    claimed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Excel Import"
         verbose_name_plural = "Excel Imports"
         ordering = ['-uploaded_at']
 
+    @staticmethod
+    def claim_expiry():
+        """Claims taken before this moment belong to a worker that has died."""
+        return timezone.now() - timedelta(seconds=settings.IMPORT_CLAIM_TIMEOUT)
+
+    @property
+    def is_being_processed(self):
+        return self.claimed_at is not None and self.claimed_at >= self.claim_expiry()
+
     def __str__(self):
         return f"Import {self.id} - {self.file.name} ({self.uploaded_at.strftime('%Y-%m-%d %H:%M')})"
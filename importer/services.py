@@ -1,9 +1,43 @@
+import logging
+import threading
+from contextlib import nullcontext
+
 import pandas as pd
-from django.db import transaction
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
 from data.models import VisaType, Occupation, MonthYear, VisaData
+from data.partitioning import replacing_months
+from data.services import refresh_after_import
+from .models import ExcelImport
+
+logger = logging.getLogger(__name__)
+
+# Largest value a PositiveSmallIntegerField holds on every supported database
+MAX_POINTS = 32767
+
+
+def _export_snapshots():
+    try:
+        call_command('export_snapshots')
+    except Exception:
+        # The import itself succeeded; a failed export only leaves the previous snapshots in place
+        logger.exception('Exporting dashboard snapshots after an import failed')
+    finally:
+        connections.close_all()
+
+
+def export_snapshots_in_background():
+    """Re-export the dashboard snapshots without holding up the request that ran the import."""
+    threading.Thread(target=_export_snapshots, name='export-snapshots', daemon=True).start()
 
 
 class ExcelImportService:
+    # Rows per batch; each batch is committed and checkpointed on its own
+    chunk_size = 1000
+
     def __init__(self):
         self.required_columns = [
             'As At Month', 'Visa Type', 'Occupation',
@@ -12,7 +46,8 @@ class ExcelImportService:
 
     def validate_file(self, file_path):
         try:
-            df = pd.read_excel(file_path)
+            # Only the header row is needed to check the columns
+            df = pd.read_excel(file_path, nrows=0)
             missing_columns = [col for col in self.required_columns if col not in df.columns]
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
@@ -20,35 +55,100 @@ class ExcelImportService:
         except Exception as e:
             raise ValueError(f"Invalid Excel file: {str(e)}")
 
-    def process_excel_file(self, file_path):
+    def process_excel_file(self, file_path, replace_months=False, excel_import=None):
+        """
+        Import the rows of an Excel file in atomic batches.
+
+        When an ExcelImport record is given, it is claimed for the duration of the call and its
+        checkpoint is advanced after every committed batch; a later call resumes from that checkpoint
+        instead of re-inserting the committed rows. A ValueError is raised when another worker holds
+        the claim.
+
+        With replace_months, the stored rows of every month in the file are replaced all or nothing:
+        a failed import leaves them untouched, and it is not checkpointed.
+        """
         self.validate_file(file_path)
 
-        # Read the entire Excel file
-        df = pd.read_excel(file_path)
+        if excel_import is None:
+            return self._process_rows(file_path, replace_months, None)
+
+        self._claim(excel_import)
+        completed = False
+        try:
+            results = self._process_rows(file_path, replace_months, excel_import)
+            completed = True
+        finally:
+            self._release(excel_import, processed=completed)
+        return results
+
+    def _claim(self, excel_import):
+        claimed = (
+            ExcelImport.objects
+            .filter(pk=excel_import.pk, processed=False)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=ExcelImport.claim_expiry()))
+            .update(claimed_at=timezone.now())
+        )
+        if not claimed:
+            raise ValueError(f'Import {excel_import.pk} is already being processed or has been processed.')
+        # Resume from the checkpoint committed by the last worker, not the one loaded by the caller
+        excel_import.refresh_from_db()
+
+    def _release(self, excel_import, processed):
+        excel_import.claimed_at = None
+        excel_import.processed = processed
+        ExcelImport.objects.filter(pk=excel_import.pk).update(claimed_at=None, processed=processed)
+
+    def _process_rows(self, file_path, replace_months, excel_import):
+        # Replacing months is all or nothing, so such an import keeps no checkpoint and always
+        # starts from the top
+        resumable = excel_import is not None and not replace_months
+        start_row = excel_import.checkpoint_rows if resumable else 0
+
+        # Read the Excel file, skipping the data rows committed by an earlier attempt
+        df = pd.read_excel(file_path, skiprows=range(1, start_row + 1))
+        df.index += start_row
 
         results = {
-            'total_rows': len(df),
-            'processed': 0,
-            'errors': []
+            'total_rows': start_row + len(df),
+            'processed': (excel_import.processed_rows or 0) if start_row else 0,
+            'errors': excel_import.errors_detail.splitlines() if start_row else []
         }
 
-        # Process in chunks to avoid memory issues
-        chunk_size = 1000
-
         # Pre-fetch existing objects to reduce DB queries
         existing_visa_types = {vt.name: vt for vt in VisaType.objects.all()}
         existing_occupations = {oc.name: oc for oc in Occupation.objects.all()}
         existing_month_years = {my.name: my for my in MonthYear.objects.all()}
 
-        for start_idx in range(0, len(df), chunk_size):
-            end_idx = min(start_idx + chunk_size, len(df))
-            chunk_df = df.iloc[start_idx:end_idx]
+        if replace_months:
+            # The stored rows of every month in this file are swapped for the file's rows at the end
+            file_month_years = {str(value).strip() for value in df['As At Month']}
+            loading = replacing_months([
+                month_year for name, month_year in existing_month_years.items() if name in file_month_years
+            ])
+        else:
+            loading = nullcontext(lambda objects: VisaData.objects.bulk_create(objects, ignore_conflicts=True))
+
+        with loading as insert:
+            for start_idx in range(0, len(df), self.chunk_size):
+                end_idx = min(start_idx + self.chunk_size, len(df))
+                chunk_df = df.iloc[start_idx:end_idx]
+
+                with transaction.atomic():
+                    self._process_chunk(
+                        chunk_df, results, insert, existing_visa_types, existing_occupations, existing_month_years
+                    )
+                    if resumable:
+                        self._save_checkpoint(excel_import, start_row + end_idx, results)
 
-            self._process_chunk(chunk_df, results, existing_visa_types, existing_occupations, existing_month_years)
+        refresh_after_import()
+        if settings.SNAPSHOT_EXPORT_ON_IMPORT:
+            transaction.on_commit(export_snapshots_in_background)
 
         return results
 
-    def _process_chunk(self, chunk_df, results, existing_visa_types, existing_occupations, existing_month_years):
+    def _process_chunk(
+        self, chunk_df, results, insert, existing_visa_types, existing_occupations, existing_month_years
+    ):
         visa_data_objects = []
 
         for index, row in chunk_df.iterrows():
@@ -64,7 +164,18 @@ class ExcelImportService:
 
         # Bulk create all objects at once
         if visa_data_objects:
-            VisaData.objects.bulk_create(visa_data_objects, ignore_conflicts=True)
+            insert(visa_data_objects)
+
+    def _save_checkpoint(self, excel_import, checkpoint_rows, results):
+        excel_import.checkpoint_rows = checkpoint_rows
+        excel_import.claimed_at = timezone.now()
+        excel_import.total_rows = results['total_rows']
+        excel_import.processed_rows = results['processed']
+        excel_import.errors_count = len(results['errors'])
+        excel_import.errors_detail = '\n'.join(results['errors'])
+        excel_import.save(update_fields=[
+            'checkpoint_rows', 'claimed_at', 'total_rows', 'processed_rows', 'errors_count', 'errors_detail'
+        ])
 
     def _process_row(self, row):
         month_year = self._get_or_create_month_year(row['As At Month'])
@@ -72,17 +183,17 @@ class ExcelImportService:
         occupation = self._get_or_create_occupation(row['Occupation'])
 
         eoi_status = str(row['EOI Status']).upper()
-        if eoi_status not in [choice[0] for choice in VisaData.Status.choices]:
+        if eoi_status not in VisaData.Status.names:
             raise ValueError(f"Invalid EOI Status: {eoi_status}")
 
-        points = self._process_points_or_count(row['Points'])
+        points = self._process_points(row['Points'])
         count_eois = self._process_points_or_count(row['Count EOIs'])
 
         VisaData.objects.create(
             month_year=month_year,
             visa_type=visa_type,
             occupation=occupation,
-            status=eoi_status,
+            status=VisaData.Status[eoi_status],
             points=points,
             count=count_eois
         )
@@ -108,45 +219,59 @@ class ExcelImportService:
         )
         return occupation
 
+    def _create_dimension(self, model, name):
+        # Own savepoint: another import adding the same name, or a failing month partition, must not
+        # abort the batch transaction this row is processed in
+        with transaction.atomic():
+            dimension, created = model.objects.get_or_create(name=name)
+        return dimension
+
     def _prepare_visa_data_object(self, row, existing_visa_types, existing_occupations, existing_month_years):
         # Get or create related objects
         month_year_name = str(row['As At Month']).strip()
         if month_year_name not in existing_month_years:
-            month_year = MonthYear.objects.create(name=month_year_name)
+            month_year = self._create_dimension(MonthYear, month_year_name)
             existing_month_years[month_year_name] = month_year
         else:
             month_year = existing_month_years[month_year_name]
 
         visa_type_name = str(row['Visa Type']).strip()
         if visa_type_name not in existing_visa_types:
-            visa_type = VisaType.objects.create(name=visa_type_name)
+            visa_type = self._create_dimension(VisaType, visa_type_name)
             existing_visa_types[visa_type_name] = visa_type
         else:
             visa_type = existing_visa_types[visa_type_name]
 
         occupation_name = str(row['Occupation']).strip()
         if occupation_name not in existing_occupations:
-            occupation = Occupation.objects.create(name=occupation_name)
+            occupation = self._create_dimension(Occupation, occupation_name)
             existing_occupations[occupation_name] = occupation
         else:
             occupation = existing_occupations[occupation_name]
 
         eoi_status = str(row['EOI Status']).upper()
-        if eoi_status not in [choice[0] for choice in VisaData.Status.choices]:
+        if eoi_status not in VisaData.Status.names:
             raise ValueError(f"Invalid EOI Status: {eoi_status}")
 
-        points = self._process_points_or_count(row['Points'])
+        points = self._process_points(row['Points'])
         count_eois = self._process_points_or_count(row['Count EOIs'])
 
         return VisaData(
             month_year=month_year,
             visa_type=visa_type,
             occupation=occupation,
-            status=eoi_status,
+            status=VisaData.Status[eoi_status],
             points=points,
             count=count_eois
         )
 
+    def _process_points(self, value):
+        points = self._process_points_or_count(value)
+        # VisaData.points is a PositiveSmallIntegerField; out-of-range values would fail the whole batch
+        if not 0 <= points <= MAX_POINTS:
+            raise ValueError(f"Invalid Points: {value}")
+        return points
+
     def _process_points_or_count(self, value):
         value_str = str(value).strip()
         if value_str == "<20":
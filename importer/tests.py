@@ -1,3 +1,168 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
 from django.test import TestCase
+from django.utils import timezone
+
+from data.models import MonthYear, Occupation, VisaData, VisaType
+from importer.models import ExcelImport
+from importer.services import ExcelImportService
+
+
+def write_sheet(file_path, rows):
+    pd.DataFrame({
+        'As At Month': ['Dec-2023'] * rows,
+        'Visa Type': ['189'] * rows,
+        'Occupation': [f'Occupation {i}' for i in range(rows)],
+        'EOI Status': ['INVITED'] * rows,
+        'Points': [65 + i for i in range(rows)],
+        'Count EOIs': [1] * rows,
+    }).to_excel(file_path, index=False)
+
+
+def batched_service():
+    service = ExcelImportService()
+    service.chunk_size = 10
+    return service
+
+
+def fail_on_second_batch(service):
+    """Patch the service so its second batch raises, as if the worker was killed."""
+    process_chunk = service._process_chunk
+    calls = []
+
+    def die_on_second_batch(*args):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        process_chunk(*args)
+
+    return mock.patch.object(service, '_process_chunk', side_effect=die_on_second_batch)
+
+
+class ResumableImportTests(TestCase):
+    rows = 25
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = str(Path(directory.name) / 'eoi.xlsx')
+        write_sheet(self.file_path, self.rows)
+        self.excel_import = ExcelImport.objects.create(file='imports/eoi.xlsx')
+
+    def service(self):
+        return batched_service()
+
+    def test_resume_after_a_killed_batch_does_not_duplicate_rows(self):
+        service = self.service()
+        with fail_on_second_batch(service):
+            with self.assertRaises(RuntimeError):
+                service.process_excel_file(self.file_path, excel_import=self.excel_import)
+
+        self.excel_import.refresh_from_db()
+        self.assertEqual(self.excel_import.checkpoint_rows, 10)
+        self.assertIsNone(self.excel_import.claimed_at)
+        self.assertFalse(self.excel_import.processed)
+
+        # Resumed from a stale copy, as a second admin click would load it
+        stale = ExcelImport.objects.get(pk=self.excel_import.pk)
+        stale.checkpoint_rows = 0
+        results = self.service().process_excel_file(self.file_path, excel_import=stale)
+
+        self.assertEqual(results['processed'], self.rows)
+        self.assertEqual(VisaData.objects.count(), self.rows)
+        self.assertEqual(VisaData.objects.values('occupation').distinct().count(), self.rows)
+        self.assertTrue(ExcelImport.objects.get(pk=self.excel_import.pk).processed)
+
+    def test_dimension_added_by_another_import_does_not_abort_the_batch(self):
+        # Created after this import prefetched the names, as a concurrent upload would
+        Occupation.objects.create(name='Occupation 0')
+        results = {'processed': 0, 'errors': []}
+
+        with transaction.atomic():
+            self.service()._process_chunk(
+                pd.read_excel(self.file_path), results, VisaData.objects.bulk_create, {}, {}, {}
+            )
+
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(VisaData.objects.count(), self.rows)
+        self.assertEqual(Occupation.objects.filter(name='Occupation 0').count(), 1)
+
+    def test_import_claimed_by_another_worker_is_refused(self):
+        ExcelImport.objects.filter(pk=self.excel_import.pk).update(claimed_at=timezone.now())
+        self.excel_import.refresh_from_db()
+        self.assertTrue(self.excel_import.is_being_processed)
+
+        with self.assertRaisesMessage(ValueError, 'already being processed'):
+            self.service().process_excel_file(self.file_path, excel_import=self.excel_import)
+        self.assertEqual(VisaData.objects.count(), 0)
+
+    def test_stale_claim_is_taken_over(self):
+        service = self.service()
+        # Just past what gunicorn lets a worker run, as after a killed import
+        ExcelImport.objects.filter(pk=self.excel_import.pk).update(
+            claimed_at=timezone.now() - timedelta(seconds=settings.WEB_WORKER_TIMEOUT + 31)
+        )
+        self.excel_import.refresh_from_db()
+        self.assertFalse(self.excel_import.is_being_processed)
+
+        service.process_excel_file(self.file_path, excel_import=self.excel_import)
+        self.assertEqual(VisaData.objects.count(), self.rows)
+
+    def test_out_of_range_points_are_row_errors(self):
+        pd.DataFrame({
+            'As At Month': ['Dec-2023'] * 3,
+            'Visa Type': ['189'] * 3,
+            'Occupation': ['Occupation'] * 3,
+            'EOI Status': ['INVITED'] * 3,
+            'Points': [-5, 70, 40000],
+            'Count EOIs': [1] * 3,
+        }).to_excel(self.file_path, index=False)
+
+        results = self.service().process_excel_file(self.file_path, excel_import=self.excel_import)
+
+        self.assertEqual(results['processed'], 1)
+        self.assertEqual(results['errors'], ['Row 1: Invalid Points: -5', 'Row 3: Invalid Points: 40000'])
+        self.assertEqual(list(VisaData.objects.values_list('points', flat=True)), [70])
+
+
+class ReplaceMonthsTests(TestCase):
+    rows = 25
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = str(Path(directory.name) / 'eoi.xlsx')
+        write_sheet(self.file_path, self.rows)
+
+        visa_type = VisaType.objects.create(name='189')
+        occupation = Occupation.objects.create(name='Old Occupation')
+        for name in ('Dec-2023', 'Jan-2024'):
+            VisaData.objects.create(
+                month_year=MonthYear.objects.create(name=name), visa_type=visa_type, occupation=occupation,
+                status=VisaData.Status.INVITED, points=50, count=3,
+            )
+
+    def month_rows(self, name):
+        return VisaData.objects.filter(month_year__name=name)
+
+    def test_months_in_the_file_are_replaced(self):
+        batched_service().process_excel_file(self.file_path, replace_months=True)
+
+        self.assertEqual(self.month_rows('Dec-2023').count(), self.rows)
+        self.assertFalse(self.month_rows('Dec-2023').filter(occupation__name='Old Occupation').exists())
+        # Months that are not in the file keep their rows
+        self.assertEqual(list(self.month_rows('Jan-2024').values_list('points', flat=True)), [50])
+
+    def test_failed_import_leaves_the_month_untouched(self):
+        service = batched_service()
+        with fail_on_second_batch(service):
+            with self.assertRaises(RuntimeError):
+                service.process_excel_file(self.file_path, replace_months=True)
 
-# Create your tests here.
+        self.assertEqual(list(self.month_rows('Dec-2023').values_list('occupation__name', flat=True)), ['Old Occupation'])
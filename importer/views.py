@@ -3,7 +3,6 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import tempfile
 import os
-from .services import ExcelImportService
 
 
 @csrf_exempt
@@ -23,8 +22,12 @@ def upload_excel(request):
                 temp_file.write(chunk)
             temp_file_path = temp_file.name
 
+        # Imported here so web workers only load pandas when an import actually runs
+        from .services import ExcelImportService
+
         service = ExcelImportService()
-        results = service.process_excel_file(temp_file_path)
+        replace_months = request.POST.get('replace_months', '').lower() == 'true'
+        results = service.process_excel_file(temp_file_path, replace_months=replace_months)
 
         os.unlink(temp_file_path)
 